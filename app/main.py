@@ -2,30 +2,39 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import mimetypes
+import os
 import re
-import shutil
+import string
 import zipfile
-from io import BytesIO
 from pathlib import Path
-from tempfile import mkdtemp
 from typing import Annotated
 
 from fastapi import FastAPI, File, HTTPException, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from starlette.background import BackgroundTask
 from starlette.responses import Response
 
-from label_converter import ConversionConfig, convert_pdf, convert_to_combined_pdf
+from label_converter import ConversionConfig, convert_batch
 
 logger = logging.getLogger(__name__)
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 FRONTEND_DIR = PROJECT_ROOT / "frontend"
 
+_SANITIZE_RE = re.compile(r"[^A-Za-z0-9._-]+")
+_SAFE_CHARS = frozenset(string.ascii_letters + string.digits + "._-")
+
+# Shared across requests; safe because conversion never mutates its config.
+_DEFAULT_CONFIG = ConversionConfig()
+
+# Bounds concurrent CPU-bound conversions so they neither block the event
+# loop nor saturate the threadpool under bursty load.
+_CONVERT_SEM = asyncio.Semaphore(os.cpu_count() or 1)
+
 app = FastAPI(title="Label Converter API", version="1.0.0")
 
 app.add_middleware(
@@ -37,9 +46,13 @@ app.add_middleware(
 )
 
 
+# Prebuilt so liveness/readiness pings skip JSON serialization entirely.
+_HEALTH_RESPONSE = Response(content=b'{"status":"ok"}', media_type="application/json")
+
+
 @app.get("/health", summary="Health check", tags=["system"])
-async def healthcheck() -> JSONResponse:
-    return JSONResponse({"status": "ok"})
+async def healthcheck() -> Response:
+    return _HEALTH_RESPONSE
 
 
 @app.get("/", include_in_schema=False, response_model=None)
@@ -63,13 +76,54 @@ def _validate_upload(upload: UploadFile) -> None:
         raise HTTPException(status_code=415, detail="Only PDF files are supported.")
 
 
+class _ZipSink:
+    """Write-only, non-seekable sink buffering ZIP output until drained."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._offset = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def tell(self) -> int:
+        return self._offset
+
+    def drain(self) -> bytes:
+        chunks, self._chunks = self._chunks, []
+        return b"".join(chunks)
+
+
+def _stream_zip(entries: list[tuple[bytes, str]]):
+    """Yield ZIP archive bytes entry by entry instead of buffering the whole archive."""
+
+    sink = _ZipSink()
+    # PDFs are deflate-compressed internally; re-compressing the archive
+    # burns CPU for near-zero size gain, so store the entries as-is.
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        for payload, arcname in entries:
+            archive.writestr(arcname, payload)
+            yield sink.drain()
+    # Closing the archive emits the central directory.
+    yield sink.drain()
+
+
 def _safe_output_name(original: str | None, index: int) -> str:
     fallback = f"file-{index}"
     if not original:
         base = fallback
     else:
         base = Path(original).stem or fallback
-    sanitized = re.sub(r"[^A-Za-z0-9._-]+", "_", base).strip("._") or fallback
+    if all(c in _SAFE_CHARS for c in base):
+        # ASCII-clean names (the common case) skip the regex entirely.
+        sanitized = base.strip("._") or fallback
+    else:
+        sanitized = _SANITIZE_RE.sub("_", base).strip("._") or fallback
     return f"{sanitized}-converted.pdf"
 
 
@@ -83,54 +137,38 @@ async def convert_endpoint(
     if not files:
         raise HTTPException(status_code=400, detail="No files uploaded.")
 
-    tmp_dir_path = Path(mkdtemp(prefix="label-converter-"))
-    converted_entries: list[tuple[Path, str]] = []
-    original_inputs: list[Path] = []
-    config = ConversionConfig()
+    converted_entries: list[tuple[bytes, str]] = []
+    config = _DEFAULT_CONFIG
 
     try:
+        original_inputs: list[bytes] = []
+        arcnames: list[str] = []
         for idx, upload in enumerate(files, start=1):
             _validate_upload(upload)
-            input_path = tmp_dir_path / f"input-{idx}.pdf"
-            output_path = tmp_dir_path / f"output-{idx}.pdf"
-
-            with input_path.open("wb") as buffer:
-                while chunk := await upload.read(1 << 16):
-                    buffer.write(chunk)
-
-            await upload.seek(0)
-
-            convert_pdf(input_path, output_path, config)
-            arcname = _safe_output_name(upload.filename, idx)
-            converted_entries.append((output_path, arcname))
-            original_inputs.append(input_path)
-
-        if original_inputs:
-            combined_path = tmp_dir_path / "combined-two-per-page.pdf"
-            convert_to_combined_pdf(original_inputs, combined_path, config)
-            converted_entries.append((combined_path, "combined-two-per-page.pdf"))
-
-        zip_buffer = BytesIO()
-        with zipfile.ZipFile(zip_buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
-            for file_path, arcname in converted_entries:
-                archive.write(file_path, arcname=arcname)
-        zip_buffer.seek(0)
-
-    except FileNotFoundError as exc:
-        shutil.rmtree(tmp_dir_path, ignore_errors=True)
-        logger.warning("Input PDF missing during conversion: %s", exc)
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+            chunks: list[bytes] = []
+            while chunk := await upload.read(1 << 20):
+                chunks.append(chunk)
+            original_inputs.append(b"".join(chunks))
+            arcnames.append(_safe_output_name(upload.filename, idx))
+
+        # One pass: each source is opened and analyzed once for both the
+        # per-file outputs and the combined imposition. Runs on a worker
+        # thread to keep the event loop responsive.
+        async with _CONVERT_SEM:
+            outputs, combined = await asyncio.to_thread(convert_batch, original_inputs, config)
+        converted_entries = list(zip(outputs, arcnames))
+        converted_entries.append((combined, "combined-two-per-page.pdf"))
+
     except Exception as exc:  # pragma: no cover - defensive guard for unexpected failures
-        shutil.rmtree(tmp_dir_path, ignore_errors=True)
         filenames = ", ".join(filter(None, (f.filename for f in files))) or "<unnamed>"
         logger.exception("Conversion failed for: %s", filenames)
         raise HTTPException(status_code=500, detail=f"Conversion failed: {exc}") from exc
 
-    background = BackgroundTask(shutil.rmtree, tmp_dir_path, ignore_errors=True)
     headers = {
         "Content-Disposition": "attachment; filename=converted-labels.zip",
     }
-    return StreamingResponse(zip_buffer, media_type="application/zip", headers=headers, background=background)
+    return StreamingResponse(_stream_zip(converted_entries), media_type="application/zip", headers=headers)
 
 
 if FRONTEND_DIR.exists():
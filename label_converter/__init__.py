@@ -1,5 +1,17 @@
 """Label conversion library for Mondial Relay / InPost PDFs."""
 
-from .converter import ConversionConfig, convert_pdf, convert_to_combined_pdf
+from .converter import (
+    ConversionConfig,
+    convert_batch,
+    convert_pdf,
+    convert_pdf_from_bytes,
+    convert_to_combined_pdf,
+)
 
-__all__ = ["ConversionConfig", "convert_pdf", "convert_to_combined_pdf"]
+__all__ = [
+    "ConversionConfig",
+    "convert_batch",
+    "convert_pdf",
+    "convert_pdf_from_bytes",
+    "convert_to_combined_pdf",
+]
@@ -2,12 +2,18 @@
 
 from __future__ import annotations
 
+import multiprocessing
+import os
 import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from io import BytesIO
 from pathlib import Path
-from typing import Iterable, List, Sequence, Tuple
+from typing import IO, Iterable, List, Sequence, Tuple
 
 import fitz  # type: ignore[attr-defined]
+import numpy as np
 
 
 PRESETS: dict[str, Tuple[float, float]] = {
@@ -15,6 +21,8 @@ PRESETS: dict[str, Tuple[float, float]] = {
     "letter": (612.0, 792.0),
 }
 
+_PAGE_SIZE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)x(\d+(?:\.\d+)?)\s*$")
+
 
 class PageSizeError(ValueError):
     """Raised when a provided page size cannot be parsed."""
@@ -32,7 +40,7 @@ def parse_page_size(value: str | Tuple[float, float]) -> Tuple[float, float]:
     if parsed in PRESETS:
         return PRESETS[parsed]
 
-    match = re.match(r"^\s*(\d+(?:\.\d+)?)x(\d+(?:\.\d+)?)\s*$", parsed)
+    match = _PAGE_SIZE_RE.match(parsed)
     if not match:
         raise PageSizeError(
             "Invalid page size format. Use 'a4', 'letter', or 'WIDTHxHEIGHT' in points (e.g. 595x842)."
@@ -61,6 +69,13 @@ class ConversionConfig:
     debug_boxes: bool = False
 
 
+def _normalize_rotation(rotation: int) -> int:
+    """Coerce a rotation value to one of the supported quarter turns."""
+
+    rot = int(rotation) % 360
+    return rot if rot in (0, 90, 180, 270) else 90
+
+
 def place_pdf(
     dst_page: fitz.Page,
     src_doc: fitz.Document,
@@ -78,14 +93,17 @@ def place_pdf(
     valign: str,
     debug: bool,
 ) -> None:
-    """Place a cropped source page into the destination rectangle."""
+    """Place a cropped source page into the destination rectangle.
+
+    ``rotation`` must already be normalized (see :func:`_normalize_rotation`)
+    and the float parameters coerced; callers hoist those conversions out of
+    their per-page loops.
+    """
 
     cw, ch = clip_rect.width, clip_rect.height
     tw, th = target_rect.width, target_rect.height
 
-    rot = int(rotation) % 360
-    if rot not in (0, 90, 180, 270):
-        rot = 90
+    rot = rotation
 
     if rot in (90, 270):
         sw, sh = ch, cw
@@ -96,11 +114,11 @@ def place_pdf(
     height_scale = th / sh
 
     if fit_mode == "cover":
-        scale = max(width_scale, height_scale) * float(extra_scale)
+        scale = max(width_scale, height_scale) * extra_scale
     else:
-        scale = min(width_scale, height_scale) * float(extra_scale)
+        scale = min(width_scale, height_scale) * extra_scale
         if fill_width and width_scale <= height_scale:
-            scale = width_scale * float(extra_scale)
+            scale = width_scale * extra_scale
 
     nw, nh = sw * scale, sh * scale
 
@@ -118,8 +136,8 @@ def place_pdf(
 
     x0 += halign_offset
 
-    min_x = target_rect.x0 - float(halign_bleed)
-    max_x = target_rect.x1 - nw + float(halign_bleed)
+    min_x = target_rect.x0 - halign_bleed
+    max_x = target_rect.x1 - nw + halign_bleed
     if max_x < min_x:
         max_x = min_x
     x0 = max(min_x, min(max_x, x0))
@@ -134,19 +152,27 @@ def place_pdf(
     dest_rect = fitz.Rect(x0, y0, x0 + nw, y0 + nh)
 
     if debug:
-        shape = dst_page.new_shape()  # type: ignore[attr-defined]
-        shape.draw_rect(target_rect)
-        shape.draw_rect(dest_rect)
-        shape.finish(width=0.6)
-        shape.commit()
+        _draw_debug_boxes(dst_page, target_rect, dest_rect)
+
+    # dest_rect already matches the rotated source aspect exactly, so skip
+    # PyMuPDF's internal proportion fitting.
+    dst_page.show_pdf_page(  # type: ignore[attr-defined]
+        dest_rect, src_doc, pno=pno, clip=clip_rect, rotate=rot, keep_proportion=False
+    )
+
 
-    dst_page.show_pdf_page(dest_rect, src_doc, pno=pno, clip=clip_rect, rotate=rot)  # type: ignore[attr-defined]
+def _draw_debug_boxes(dst_page: fitz.Page, target_rect: fitz.Rect, dest_rect: fitz.Rect) -> None:
+    shape = dst_page.new_shape()  # type: ignore[attr-defined]
+    shape.draw_rect(target_rect)
+    shape.draw_rect(dest_rect)
+    shape.finish(width=0.6)
+    shape.commit()
 
 
 def auto_detect_left_ratio(
     page: fitz.Page,
     *,
-    dpi: float = 150.0,
+    dpi: float = 72.0,
     min_ratio: float = 0.45,
     threshold: int = 245,
     blank_ratio: float = 0.0,
@@ -156,32 +182,66 @@ def auto_detect_left_ratio(
     """Estimate how much of the page width to keep based on blank space detection."""
 
     scale = dpi / 72.0
-    pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), colorspace=fitz.csGRAY, alpha=False)  # type: ignore[attr-defined]
-    width, height = pix.width, pix.height
-    samples = pix.samples
+    rect = page.rect
+    # The cut can only land right of min_ratio, so rendering the left part of
+    # the page would be wasted work; rasterize the candidate region only.
+    clip = None
+    offset_px = 0.0
+    if min_ratio > 0.0:
+        clip = fitz.Rect(rect.x0 + rect.width * min_ratio, rect.y0, rect.x1, rect.y1)
+        offset_px = rect.width * min_ratio * scale
+
+    pix = page.get_pixmap(  # type: ignore[attr-defined]
+        matrix=fitz.Matrix(scale, scale), colorspace=fitz.csGRAY, alpha=False, annots=False, clip=clip
+    )
+
+    try:
+        width, height = pix.width, pix.height
+
+        samples = np.frombuffer(pix.samples, dtype=np.uint8)
+        if pix.stride == width:
+            # Contiguous rows keep NumPy on its vectorized byte-compare
+            # kernels instead of the strided fallback loops.
+            img = samples.reshape(height, width)
+        else:
+            # Rows are padded; slice the view back down to the visible width.
+            img = samples.reshape(height, pix.stride)[:, :width]
+
+        blank_threshold = max(0, int(height * blank_ratio))
+        if blank_threshold == 0:
+            # Common case: a single dark pixel disqualifies the column, so an
+            # all-reduction suffices and no per-column count is needed.
+            blank_mask = (img >= threshold).all(axis=0)
+        else:
+            blank_mask = np.count_nonzero(img < threshold, axis=0) <= blank_threshold
+        blank_cols = blank_mask.tolist()
+    finally:
+        # The run scan below only needs the boolean columns; free the C
+        # pixmap buffer before it runs.
+        del pix
 
     blanks = 0
-    seen_content = False
+    # When the render is clipped, label content sits left of the boundary by
+    # assumption, so the scan starts as if content was already seen; a gap
+    # straddling min_ratio then cuts at the boundary instead of being missed.
+    seen_content = clip is not None
     blank_start = width
-    run_threshold = max(1, int(blank_run_px))
-    blank_threshold = max(0, int(height * blank_ratio))
+    # blank_run_px / extra_margin_px are expressed in 150 DPI pixels (the
+    # historical detection resolution); rescale to the active resolution.
+    px_scale = dpi / 150.0
+    run_threshold = max(1, int(blank_run_px * px_scale))
 
     for x in range(width):
-        dark_pixels = 0
-        offset = x
-        for _ in range(height):
-            if samples[offset] < threshold:
-                dark_pixels += 1
-            offset += width
-
-        if dark_pixels <= blank_threshold:
+        if blank_cols[x]:
             if seen_content:
                 if blanks == 0:
                     blank_start = x
                 blanks += 1
                 if blanks >= run_threshold:
-                    cut_idx = min(width, blank_start + int(extra_margin_px))
-                    ratio = cut_idx / width
+                    cut_idx = min(width, blank_start + int(extra_margin_px * px_scale))
+                    # Map the cut back to full-page coordinates; the pixmap
+                    # only covers the region right of min_ratio.
+                    ratio = (offset_px + cut_idx) / (offset_px + width)
                     return max(min_ratio, min(1.0, ratio))
         else:
             seen_content = True
@@ -215,6 +275,72 @@ def _compute_clips(
     return clips
 
 
+_render_pool: ProcessPoolExecutor | None = None
+_render_pool_lock = threading.Lock()
+
+
+def _get_render_pool() -> ProcessPoolExecutor:
+    """Return the shared page-render pool, creating it on first use.
+
+    One process-lifetime pool bounds the total worker count regardless of how
+    many conversions run concurrently. The spawn context avoids forking a
+    multithreaded parent (conversions run on worker threads in the service).
+    """
+
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _render_pool
+
+
+def _open_source(input_ref: str | bytes) -> fitz.Document:
+    """Open a source document from either a filesystem path or raw PDF bytes."""
+
+    if isinstance(input_ref, bytes):
+        return fitz.open(stream=input_ref, filetype="pdf")
+    return fitz.open(input_ref)
+
+
+def _render_one_page(
+    input_ref: str | bytes,
+    pno: int,
+    cfg: ConversionConfig,
+    out_w: float,
+    out_h: float,
+    clip: Tuple[float, float, float, float],
+    target: Tuple[float, float, float, float],
+) -> bytes:
+    """Render a single source page into a one-page PDF and return its bytes.
+
+    Runs in worker processes, so all arguments must be picklable; rectangles
+    travel as plain coordinate tuples.
+    """
+
+    with _open_source(input_ref) as src, fitz.open() as doc:
+        page = doc.new_page(width=out_w, height=out_h)  # type: ignore[attr-defined]
+        place_pdf(
+            page,
+            src,
+            pno,
+            fitz.Rect(*clip),
+            fitz.Rect(*target),
+            rotation=_normalize_rotation(cfg.rotate),
+            fit_mode=cfg.fit,
+            extra_scale=float(cfg.scale),
+            fill_width=cfg.fill_width,
+            halign=cfg.halign,
+            halign_offset=float(cfg.halign_offset),
+            halign_bleed=float(cfg.halign_bleed),
+            valign=cfg.valign,
+            debug=cfg.debug_boxes,
+        )
+        return doc.tobytes()
+
+
 def _resolve_page_dimensions(cfg: ConversionConfig) -> Tuple[float, float]:
     out_w, out_h = parse_page_size(cfg.page)
     if out_h < out_w:
@@ -222,62 +348,148 @@ def _resolve_page_dimensions(cfg: ConversionConfig) -> Tuple[float, float]:
     return out_w, out_h
 
 
+def _save_document(dst: fitz.Document, output: str | Path | IO[bytes]) -> None:
+    """Save a destination document to a filesystem path or a binary file-like."""
+
+    if isinstance(output, (str, Path)):
+        output = Path(output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        dst.save(str(output))
+    else:
+        output.write(dst.tobytes())
+
+
 def convert_pdf(
     input_path: str | Path,
-    output_path: str | Path,
+    output_path: str | Path | IO[bytes],
     config: ConversionConfig | None = None,
-) -> None:
-    """Convert a Mondial Relay label PDF into the desired format."""
+) -> list[fitz.Rect]:
+    """Convert a Mondial Relay label PDF into the desired format.
+
+    ``output_path`` may be a filesystem path or a binary file-like object.
+    Returns the per-page clip rectangles that were applied.
+    """
 
     cfg = config or ConversionConfig()
     input_path = Path(input_path)
-    output_path = Path(output_path)
 
     if not input_path.exists():
         raise FileNotFoundError(f"Input PDF not found: {input_path}")
 
+    with fitz.open(input_path) as src:
+        return _convert_document(src, str(input_path), output_path, cfg)
+
+
+def convert_pdf_from_bytes(
+    data: bytes,
+    output_path: str | Path | IO[bytes],
+    config: ConversionConfig | None = None,
+) -> list[fitz.Rect]:
+    """Convert an in-memory label PDF, avoiding the disk round-trip of :func:`convert_pdf`."""
+
+    cfg = config or ConversionConfig()
+    with fitz.open(stream=data, filetype="pdf") as src:
+        return _convert_document(src, data, output_path, cfg)
+
+
+def _convert_document(
+    src: fitz.Document,
+    input_ref: str | bytes,
+    output_path: str | Path | IO[bytes],
+    cfg: ConversionConfig,
+) -> list[fitz.Rect]:
     out_w, out_h = _resolve_page_dimensions(cfg)
     target_rect = fitz.Rect(cfg.margin, cfg.margin, out_w - cfg.margin, out_h - cfg.margin)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with fitz.open(input_path) as src, fitz.open() as dst:
+    with fitz.open() as dst:
         pages = list(range(len(src)))
         clips = _compute_clips(pages, src, cfg)
 
-        for idx, clip in zip(pages, clips):
-            page = dst.new_page(width=out_w, height=out_h)  # type: ignore[attr-defined]
-            place_pdf(
-                page,
-                src,
-                idx,
-                clip,
-                target_rect,
-                rotation=cfg.rotate,
-                fit_mode=cfg.fit,
-                extra_scale=cfg.scale,
-                fill_width=cfg.fill_width,
-                halign=cfg.halign,
-                halign_offset=cfg.halign_offset,
-                halign_bleed=cfg.halign_bleed,
-                valign=cfg.valign,
-                debug=cfg.debug_boxes,
-            )
+        if len(pages) > 1:
+            # Page rendering is CPU-bound and independent per page; fan the
+            # pages out to the shared worker pool and reassemble in order.
+            target = (target_rect.x0, target_rect.y0, target_rect.x1, target_rect.y1)
+            pool = _get_render_pool()
+            futures = [
+                pool.submit(
+                    _render_one_page,
+                    input_ref,
+                    idx,
+                    cfg,
+                    out_w,
+                    out_h,
+                    (clip.x0, clip.y0, clip.x1, clip.y1),
+                    target,
+                )
+                for idx, clip in zip(pages, clips)
+            ]
+            for future in futures:
+                with fitz.open(stream=future.result(), filetype="pdf") as part:
+                    dst.insert_pdf(part)  # type: ignore[attr-defined]
+        else:
+            rot = _normalize_rotation(cfg.rotate)
+            extra_scale = float(cfg.scale)
+            halign_offset = float(cfg.halign_offset)
+            halign_bleed = float(cfg.halign_bleed)
+            for idx, clip in zip(pages, clips):
+                page = dst.new_page(width=out_w, height=out_h)  # type: ignore[attr-defined]
+                place_pdf(
+                    page,
+                    src,
+                    idx,
+                    clip,
+                    target_rect,
+                    rotation=rot,
+                    fit_mode=cfg.fit,
+                    extra_scale=extra_scale,
+                    fill_width=cfg.fill_width,
+                    halign=cfg.halign,
+                    halign_offset=halign_offset,
+                    halign_bleed=halign_bleed,
+                    valign=cfg.valign,
+                    debug=cfg.debug_boxes,
+                )
+
+        _save_document(dst, output_path)
 
-        dst.save(str(output_path))
+    return clips
 
 
 def convert_to_combined_pdf(
-    input_paths: Sequence[str | Path],
-    output_path: str | Path,
+    input_paths: Sequence[str | Path | bytes],
+    output_path: str | Path | IO[bytes],
     config: ConversionConfig | None = None,
     *,
     gap: float | None = None,
+    precomputed_clips: Sequence[Sequence[fitz.Rect]] | None = None,
 ) -> None:
-    """Convert multiple label PDFs and impose two labels per output page."""
+    """Convert multiple label PDFs and impose two labels per output page.
+
+    Inputs may be filesystem paths or raw PDF bytes; ``output_path`` may be a
+    path or a binary file-like object. ``precomputed_clips`` takes one clip
+    list per input (as returned by :func:`convert_pdf`) to skip re-detection.
+    """
 
     cfg = config or ConversionConfig()
-    output_path = Path(output_path)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    documents: List[fitz.Document] = []
+    try:
+        for input_path in input_paths:
+            documents.append(_open_source(input_path if isinstance(input_path, bytes) else str(input_path)))
+        _combine_documents(documents, output_path, cfg, gap=gap, precomputed_clips=precomputed_clips)
+    finally:
+        for doc in documents:
+            doc.close()
+
+
+def _combine_documents(
+    sources: Sequence[fitz.Document],
+    output_path: str | Path | IO[bytes],
+    cfg: ConversionConfig,
+    *,
+    gap: float | None = None,
+    precomputed_clips: Sequence[Sequence[fitz.Rect]] | None = None,
+) -> None:
+    """Impose the pages of already-open source documents two per output page."""
 
     out_w, out_h = _resolve_page_dimensions(cfg)
     available_height = out_h - 2 * cfg.margin
@@ -293,16 +505,20 @@ def convert_to_combined_pdf(
     bottom_rect = fitz.Rect(cfg.margin, out_h - cfg.margin - slot_height, out_w - cfg.margin, out_h - cfg.margin)
 
     dst = fitz.open()
-    documents: List[fitz.Document] = []
     slot_index = 0
     current_page: fitz.Page | None = None
+    rot = _normalize_rotation(cfg.rotate)
+    extra_scale = float(cfg.scale)
+    halign_offset = float(cfg.halign_offset)
+    halign_bleed = float(cfg.halign_bleed)
 
     try:
-        for input_path in input_paths:
-            source = fitz.open(Path(input_path))
-            documents.append(source)
+        for file_idx, source in enumerate(sources):
             pages = list(range(len(source)))
-            clips = _compute_clips(pages, source, cfg)
+            if precomputed_clips is not None:
+                clips = list(precomputed_clips[file_idx])
+            else:
+                clips = _compute_clips(pages, source, cfg)
 
             for idx, clip in zip(pages, clips):
                 if slot_index == 0:
@@ -320,13 +536,13 @@ def convert_to_combined_pdf(
                     idx,
                     clip,
                     target,
-                    rotation=cfg.rotate,
+                    rotation=rot,
                     fit_mode=cfg.fit,
-                    extra_scale=cfg.scale,
+                    extra_scale=extra_scale,
                     fill_width=cfg.fill_width,
                     halign=cfg.halign,
-                    halign_offset=cfg.halign_offset,
-                    halign_bleed=cfg.halign_bleed,
+                    halign_offset=halign_offset,
+                    halign_bleed=halign_bleed,
                     valign="top",
                     debug=cfg.debug_boxes,
                 )
@@ -334,7 +550,39 @@ def convert_to_combined_pdf(
                 slot_index = (slot_index + 1) % 2
 
     finally:
-        dst.save(str(output_path))
+        _save_document(dst, output_path)
         dst.close()
-        for doc in documents:
-            doc.close()
+
+
+def convert_batch(
+    inputs: Sequence[bytes],
+    config: ConversionConfig | None = None,
+    *,
+    gap: float | None = None,
+) -> tuple[list[bytes], bytes]:
+    """Convert several in-memory label PDFs in one pass.
+
+    Each source document is opened and analyzed exactly once and shared
+    between the per-file conversion and the combined two-per-page imposition.
+    Returns the converted PDFs (one per input, in order) and the combined PDF.
+    """
+
+    cfg = config or ConversionConfig()
+    sources: List[fitz.Document] = []
+    try:
+        for data in inputs:
+            sources.append(fitz.open(stream=data, filetype="pdf"))
+
+        outputs: list[bytes] = []
+        clips_per_source: list[list[fitz.Rect]] = []
+        for data, source in zip(inputs, sources):
+            buffer = BytesIO()
+            clips_per_source.append(_convert_document(source, data, buffer, cfg))
+            outputs.append(buffer.getvalue())
+
+        combined_buffer = BytesIO()
+        _combine_documents(sources, combined_buffer, cfg, gap=gap, precomputed_clips=clips_per_source)
+        return outputs, combined_buffer.getvalue()
+    finally:
+        for source in sources:
+            source.close()